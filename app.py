@@ -13,27 +13,55 @@ Data persists in a local SQLite database file (instance/workouts.sqlite3).
 from __future__ import annotations
 
 import os
+import queue
 import sqlite3
+import threading
 import time
 from dataclasses import dataclass
 from datetime import date, datetime
-from typing import Any, Dict, List, Optional, Tuple
+from itertools import groupby, islice
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from flask import Flask, jsonify, render_template, request
+import orjson
+from flask import Flask, Response, current_app, g, jsonify, render_template, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 
 
 # ----------------------------
 # App + DB setup
 # ----------------------------
 
+SERVER_THREADS = 8
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Serialize jsonify() responses with orjson (C) instead of the stdlib json module."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
 def create_app() -> Flask:
     app = Flask(__name__, instance_relative_config=True)
+    app.json = ORJSONProvider(app)
 
     # Store DB in instance/ so it doesn't get accidentally committed.
     os.makedirs(app.instance_path, exist_ok=True)
     app.config["DATABASE_PATH"] = os.path.join(app.instance_path, "workouts.sqlite3")
 
     init_db(app.config["DATABASE_PATH"])
+    # One connection per server thread.
+    app.extensions["db_pool"] = ConnectionPool(app.config["DATABASE_PATH"], size=SERVER_THREADS)
+    app.teardown_appcontext(release_conn)
 
     # ----------------------------
     # UI routes
@@ -62,15 +90,29 @@ def create_app() -> Flask:
 
     @app.get("/api/workouts")
     def api_list_workouts():
-        t0 = time.perf_counter()
-        workouts = list_workouts(app.config["DATABASE_PATH"])
-        elapsed_ms = round((time.perf_counter() - t0) * 1000, 2)
-        return jsonify({"ok": True, "workouts": workouts, "timing_ms": elapsed_ms})
+        # The ETag is the DB's id + write counter, so an unchanged history is a
+        # single-row lookup + 304 and the browser reuses its cached copy.
+        # no-cache makes the browser revalidate every time instead of guessing.
+        etag = f"workouts-{data_version(get_conn())}"
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            # Streamed as NDJSON (one workout per line) straight off the cursor, so
+            # the client gets the first rows immediately and the server never holds
+            # the whole history in memory. The client measures load time itself.
+            def generate() -> Iterator[bytes]:
+                for workout in list_workouts(get_conn()):
+                    yield orjson.dumps(workout) + b"\n"
+
+            response = Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
 
     @app.get("/api/workouts/<int:workout_id>")
     def api_get_workout(workout_id: int):
         t0 = time.perf_counter()
-        workout = get_workout(app.config["DATABASE_PATH"], workout_id)
+        workout = get_workout(get_conn(), workout_id)
         elapsed_ms = round((time.perf_counter() - t0) * 1000, 2)
         if workout is None:
             return jsonify({"ok": False, "error": "Workout not found."}), 404
@@ -83,9 +125,12 @@ def create_app() -> Flask:
         if errors:
             return jsonify({"ok": False, "errors": errors}), 400
 
-        workout_id = create_workout(app.config["DATABASE_PATH"], payload)
-        workout = get_workout(app.config["DATABASE_PATH"], workout_id)
-        return jsonify({"ok": True, "workout_id": workout_id, "workout": workout}), 201
+        try:
+            with db_write_lock():
+                workout = create_workout(get_conn(), payload)
+        except sqlite3.IntegrityError as e:
+            return jsonify({"ok": False, "errors": [integrity_error_message(e)]}), 400
+        return jsonify({"ok": True, "workout_id": workout["id"], "workout": workout}), 201
 
     @app.put("/api/workouts/<int:workout_id>")
     def api_update_workout(workout_id: int):
@@ -94,16 +139,20 @@ def create_app() -> Flask:
         if errors:
             return jsonify({"ok": False, "errors": errors}), 400
 
-        updated = update_workout(app.config["DATABASE_PATH"], workout_id, payload)
-        if not updated:
+        try:
+            with db_write_lock():
+                workout = update_workout(get_conn(), workout_id, payload)
+        except sqlite3.IntegrityError as e:
+            return jsonify({"ok": False, "errors": [integrity_error_message(e)]}), 400
+        if workout is None:
             return jsonify({"ok": False, "error": "Workout not found."}), 404
 
-        workout = get_workout(app.config["DATABASE_PATH"], workout_id)
         return jsonify({"ok": True, "workout": workout})
 
     @app.delete("/api/workouts/<int:workout_id>")
     def api_delete_workout(workout_id: int):
-        deleted = delete_workout(app.config["DATABASE_PATH"], workout_id)
+        with db_write_lock():
+            deleted = delete_workout(get_conn(), workout_id)
         if not deleted:
             return jsonify({"ok": False, "error": "Workout not found."}), 404
         return jsonify({"ok": True})
@@ -114,31 +163,89 @@ def create_app() -> Flask:
         payload = request.get_json(silent=True) or {}
         count = int(payload.get("count", 200))
         count = max(1, min(count, 2000))  # keep bounded
-        created = seed_sample_data(app.config["DATABASE_PATH"], count=count)
+        with db_write_lock():
+            created = seed_sample_data(get_conn(), count=count)
         return jsonify({"ok": True, "created": created})
 
     return app
 
 
 def get_db_connection(db_path: str) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    """
+    Open a connection in autocommit mode; writers start their own
+    BEGIN IMMEDIATE transaction so they take the write lock up front
+    instead of upgrading mid-transaction.
+
+    The DB runs in WAL mode (set once in init_db), so readers such as
+    list_workouts don't block on, or get "database is locked" from, a
+    concurrent writer. synchronous=NORMAL is safe under WAL and skips the
+    per-commit fsync, which is fine for a local demo DB.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False, cached_statements=256)
     conn.execute("PRAGMA foreign_keys = ON;")
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA cache_size = -64000;")  # ~64 MB
+    conn.execute("PRAGMA mmap_size = 268435456;")  # 256 MB
     return conn
 
 
+class ConnectionPool:
+    """
+    Fixed-size pool of long-lived connections, so requests don't pay the
+    open + PRAGMA setup cost every time. SQLite only allows one writer at a
+    time anyway, so writers also share a single lock instead of contending
+    for the file lock.
+    """
+
+    def __init__(self, db_path: str, size: int = 4) -> None:
+        self._conns: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._conns.put(get_db_connection(db_path))
+        self.write_lock = threading.Lock()
+
+    def acquire(self) -> sqlite3.Connection:
+        return self._conns.get()
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        self._conns.put(conn)
+
+
+def get_conn() -> sqlite3.Connection:
+    """Borrow a pooled connection for the rest of this request."""
+    if "db" not in g:
+        g.db = current_app.extensions["db_pool"].acquire()
+    return g.db
+
+
+def release_conn(exc: Optional[BaseException] = None) -> None:
+    """Return the request's connection to the pool (it stays open)."""
+    conn = g.pop("db", None)
+    if conn is not None:
+        current_app.extensions["db_pool"].release(conn)
+
+
+def db_write_lock() -> threading.Lock:
+    return current_app.extensions["db_pool"].write_lock
+
+
 def init_db(db_path: str) -> None:
     """Create tables if they don't exist (idempotent)."""
     conn = get_db_connection(db_path)
     try:
+        # journal_mode is persistent in the DB file, so it only needs setting once.
+        conn.execute("PRAGMA journal_mode = WAL;")
         conn.executescript(
             """
             CREATE TABLE IF NOT EXISTS workouts (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 workout_date TEXT NOT NULL, -- ISO date YYYY-MM-DD
-                title TEXT,
+                title TEXT NOT NULL DEFAULT '',
                 created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
+                updated_at TEXT NOT NULL,
+                -- Denormalized child counts for the history list, kept up to date by triggers.
+                exercise_count INTEGER NOT NULL DEFAULT 0,
+                set_count INTEGER NOT NULL DEFAULT 0
             );
 
             CREATE TABLE IF NOT EXISTS exercises (
@@ -161,13 +268,105 @@ def init_db(db_path: str) -> None:
             CREATE INDEX IF NOT EXISTS idx_workouts_date ON workouts(workout_date DESC);
             CREATE INDEX IF NOT EXISTS idx_exercises_workout ON exercises(workout_id, sort_order);
             CREATE INDEX IF NOT EXISTS idx_sets_exercise ON sets(exercise_id, set_number);
+
+            -- Single-row counter bumped by every write; used as the history list's ETag.
+            -- db_id is random per DB file, so a recreated DB's versions never match
+            -- ETags the browser cached from the old one.
+            CREATE TABLE IF NOT EXISTS data_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL,
+                db_id TEXT NOT NULL DEFAULT (lower(hex(randomblob(8))))
+            );
+            INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0);
+            """
+        )
+        _migrate_workout_counts(conn)
+        _migrate_null_titles(conn)
+        _migrate_data_version_db_id(conn)
+        conn.executescript(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_exercises_ai AFTER INSERT ON exercises
+            BEGIN
+                UPDATE workouts SET exercise_count = exercise_count + 1 WHERE id = NEW.workout_id;
+            END;
+
+            -- BEFORE, not AFTER: the exercise's sets are cascade-deleted ahead of
+            -- any AFTER trigger, and trg_sets_ad can no longer see this exercise
+            -- to find the workout. So remove the sets from the count here.
+            CREATE TRIGGER IF NOT EXISTS trg_exercises_bd BEFORE DELETE ON exercises
+            BEGIN
+                UPDATE workouts
+                SET exercise_count = exercise_count - 1,
+                    set_count = set_count - (SELECT COUNT(*) FROM sets WHERE exercise_id = OLD.id)
+                WHERE id = OLD.workout_id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_sets_ai AFTER INSERT ON sets
+            BEGIN
+                UPDATE workouts SET set_count = set_count + 1
+                WHERE id = (SELECT workout_id FROM exercises WHERE id = NEW.exercise_id);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_sets_ad AFTER DELETE ON sets
+            BEGIN
+                UPDATE workouts SET set_count = set_count - 1
+                WHERE id = (SELECT workout_id FROM exercises WHERE id = OLD.exercise_id);
+            END;
+
+            -- Refresh planner statistics so queries pick the indexes above.
+            ANALYZE;
             """
         )
-        conn.commit()
     finally:
         conn.close()
 
 
+def _migrate_null_titles(conn: sqlite3.Connection) -> None:
+    """
+    Older DBs stored a missing title as NULL (and the column there is still
+    nullable). Writers now always store '', so normalize the old rows and
+    reads can skip COALESCE.
+    """
+    with conn:
+        conn.execute("BEGIN IMMEDIATE;")
+        conn.execute("UPDATE workouts SET title = '' WHERE title IS NULL;")
+
+
+def _migrate_data_version_db_id(conn: sqlite3.Connection) -> None:
+    """Add + fill data_version.db_id on DBs created before that column existed."""
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(data_version);")}  # (cid, name, type, ...)
+    if "db_id" in columns:
+        return
+    with conn:
+        conn.execute("BEGIN IMMEDIATE;")
+        # ADD COLUMN only takes constant defaults, so fill in the random id afterwards.
+        conn.execute("ALTER TABLE data_version ADD COLUMN db_id TEXT NOT NULL DEFAULT '';")
+        conn.execute("UPDATE data_version SET db_id = lower(hex(randomblob(8)));")
+
+
+def _migrate_workout_counts(conn: sqlite3.Connection) -> None:
+    """Add + backfill exercise_count/set_count on DBs created before those columns existed."""
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(workouts);")}  # (cid, name, type, ...)
+    if "exercise_count" in columns:
+        return
+    with conn:
+        conn.execute("BEGIN IMMEDIATE;")
+        conn.execute("ALTER TABLE workouts ADD COLUMN exercise_count INTEGER NOT NULL DEFAULT 0;")
+        conn.execute("ALTER TABLE workouts ADD COLUMN set_count INTEGER NOT NULL DEFAULT 0;")
+        conn.execute(
+            """
+            UPDATE workouts
+            SET exercise_count = (SELECT COUNT(*) FROM exercises e WHERE e.workout_id = workouts.id),
+                set_count = (
+                    SELECT COUNT(*)
+                    FROM sets s
+                    JOIN exercises e ON e.id = s.exercise_id
+                    WHERE e.workout_id = workouts.id
+                );
+            """
+        )
+
+
 # ----------------------------
 # Validation helpers
 # ----------------------------
@@ -179,10 +378,13 @@ def _parse_iso_date(value: Any) -> Optional[str]:
         value = value.strip()
         if not value:
             return None
-        # Accept YYYY-MM-DD
+        # Accept YYYY-MM-DD. fromisoformat is C-implemented (much cheaper than
+        # strptime), but on 3.11+ it also takes forms like "20240101", hence
+        # the shape check.
+        if len(value) != 10 or value[4] != "-" or value[7] != "-":
+            return None
         try:
-            dt = datetime.strptime(value, "%Y-%m-%d").date()
-            return dt.isoformat()
+            return date.fromisoformat(value).isoformat()
         except ValueError:
             return None
     return None
@@ -201,250 +403,399 @@ def validate_workout_payload(payload: Dict[str, Any]) -> List[str]:
         }, ...
       ]
     }
+
+    Only the payload's shape is checked here. Reps/weight ranges are enforced
+    by the sets table's CHECK constraints when the rows are written (see
+    integrity_error_message).
     """
     errors: List[str] = []
+    append = errors.append
 
     workout_date = _parse_iso_date(payload.get("workout_date"))
     if not workout_date:
-        errors.append("Workout date is required (YYYY-MM-DD).")
+        append("Workout date is required (YYYY-MM-DD).")
 
     exercises = payload.get("exercises")
     if not isinstance(exercises, list) or len(exercises) == 0:
-        errors.append("At least one exercise is required.")
+        append("At least one exercise is required.")
         return errors  # other checks depend on exercises structure
 
     for ei, ex in enumerate(exercises):
         if not isinstance(ex, dict):
-            errors.append(f"Exercise #{ei+1} is invalid.")
+            append(f"Exercise #{ei+1} is invalid.")
             continue
 
         name = str(ex.get("name") or "").strip()
         if not name:
-            errors.append(f"Exercise #{ei+1}: name is required.")
+            append(f"Exercise #{ei+1}: name is required.")
 
         sets_ = ex.get("sets")
         if not isinstance(sets_, list) or len(sets_) == 0:
-            errors.append(f"Exercise '{name or ei+1}': at least one set is required.")
+            append(f"Exercise '{name or ei+1}': at least one set is required.")
             continue
 
         for si, s in enumerate(sets_):
             if not isinstance(s, dict):
-                errors.append(f"Exercise '{name or ei+1}' set #{si+1} is invalid.")
-                continue
+                append(f"Exercise '{name or ei+1}' set #{si+1} is invalid.")
+
+    return errors
+
 
-            reps = s.get("reps")
-            weight = s.get("weight")
+def _to_int(value: Any) -> Optional[int]:
+    # Unparseable values become NULL so the sets table's NOT NULL/CHECK
+    # constraints reject them along with out-of-range numbers. Same for ints
+    # SQLite can't store (64-bit), which would otherwise raise OverflowError.
+    try:
+        v = int(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return v if -2**63 <= v < 2**63 else None
 
-            try:
-                reps_int = int(reps)
-            except (TypeError, ValueError):
-                reps_int = None
 
-            try:
-                weight_num = float(weight)
-            except (TypeError, ValueError):
-                weight_num = None
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
 
-            if reps_int is None or reps_int < 1:
-                errors.append(f"Exercise '{name or ei+1}' set #{si+1}: reps must be >= 1.")
-            if weight_num is None or weight_num < 0:
-                errors.append(f"Exercise '{name or ei+1}' set #{si+1}: weight must be >= 0.")
 
-    return errors
+# sqlite3.IntegrityError text -> message shown to the user.
+_INTEGRITY_ERROR_MESSAGES = {
+    "CHECK constraint failed: reps >= 1": "Reps must be a whole number >= 1.",
+    "NOT NULL constraint failed: sets.reps": "Reps must be a whole number >= 1.",
+    "CHECK constraint failed: weight >= 0": "Weight must be a number >= 0.",
+    "NOT NULL constraint failed: sets.weight": "Weight must be a number >= 0.",
+}
+
+
+def integrity_error_message(exc: sqlite3.IntegrityError) -> str:
+    return _INTEGRITY_ERROR_MESSAGES.get(str(exc), str(exc))
 
 
 # ----------------------------
 # DB operations
 # ----------------------------
 
-def list_workouts(db_path: str) -> List[Dict[str, Any]]:
-    conn = get_db_connection(db_path)
-    try:
-        rows = conn.execute(
-            """
-            SELECT
-                w.id,
-                w.workout_date,
-                COALESCE(w.title, '') AS title,
-                w.created_at,
-                w.updated_at,
-                COUNT(DISTINCT e.id) AS exercise_count,
-                COUNT(s.id) AS set_count
-            FROM workouts w
-            LEFT JOIN exercises e ON e.workout_id = w.id
-            LEFT JOIN sets s ON s.exercise_id = e.id
-            GROUP BY w.id
-            ORDER BY w.workout_date DESC, w.id DESC;
-            """
-        ).fetchall()
+# SQL is kept in module-level constants so every call site sends the exact
+# same text and hits the connection's prepared-statement cache.
 
-        return [dict(r) for r in rows]
-    finally:
-        conn.close()
+# exercise_count/set_count are maintained by triggers (see init_db), so the
+# history list is a plain walk of idx_workouts_date with no joins.
+_SQL_LIST_WORKOUTS = """
+    SELECT id, workout_date, title, created_at, updated_at, exercise_count, set_count
+    FROM workouts
+    ORDER BY workout_date DESC, id DESC;
+"""
 
+_SQL_DATA_VERSION = "SELECT db_id, version FROM data_version WHERE id = 1;"
 
-def get_workout(db_path: str, workout_id: int) -> Optional[Dict[str, Any]]:
-    conn = get_db_connection(db_path)
-    try:
-        w = conn.execute(
-            """
-            SELECT id, workout_date, COALESCE(title, '') AS title, created_at, updated_at
-            FROM workouts
-            WHERE id = ?;
-            """,
-            (workout_id,),
-        ).fetchone()
-
-        if w is None:
-            return None
+_SQL_BUMP_DATA_VERSION = "UPDATE data_version SET version = version + 1 WHERE id = 1;"
 
-        exercises_rows = conn.execute(
-            """
-            SELECT id, name, sort_order
-            FROM exercises
-            WHERE workout_id = ?
-            ORDER BY sort_order ASC, id ASC;
-            """,
-            (workout_id,),
-        ).fetchall()
+_SQL_GET_WORKOUT = """
+    SELECT id, workout_date, title, created_at, updated_at
+    FROM workouts
+    WHERE id = ?;
+"""
 
-        exercises: List[Dict[str, Any]] = []
-        for ex in exercises_rows:
-            sets_rows = conn.execute(
-                """
-                SELECT id, set_number, reps, weight
-                FROM sets
-                WHERE exercise_id = ?
-                ORDER BY set_number ASC, id ASC;
-                """,
-                (ex["id"],),
-            ).fetchall()
-
-            exercises.append(
-                {
-                    "id": ex["id"],
-                    "name": ex["name"],
-                    "sort_order": ex["sort_order"],
-                    "sets": [dict(sr) for sr in sets_rows],
-                }
-            )
+_SQL_GET_WORKOUT_EXERCISES = """
+    SELECT
+        e.id AS ex_id,
+        e.name,
+        e.sort_order,
+        s.id AS s_id,
+        s.set_number,
+        s.reps,
+        s.weight
+    FROM exercises e
+    LEFT JOIN sets s ON s.exercise_id = e.id
+    WHERE e.workout_id = ?
+    ORDER BY e.sort_order ASC, e.id ASC, s.set_number ASC, s.id ASC;
+"""
 
-        return {
-            "id": w["id"],
-            "workout_date": w["workout_date"],
-            "title": w["title"],
-            "created_at": w["created_at"],
-            "updated_at": w["updated_at"],
-            "exercises": exercises,
-        }
-    finally:
-        conn.close()
+_SQL_WORKOUT_CREATED_AT = "SELECT created_at FROM workouts WHERE id = ?;"
 
+_SQL_INSERT_WORKOUT = """
+    INSERT INTO workouts (workout_date, title, created_at, updated_at)
+    VALUES (?, ?, ?, ?);
+"""
 
-def create_workout(db_path: str, payload: Dict[str, Any]) -> int:
-    conn = get_db_connection(db_path)
+_SQL_UPDATE_WORKOUT = """
+    UPDATE workouts
+    SET workout_date = ?, title = ?, updated_at = ?
+    WHERE id = ?;
+"""
+
+_SQL_DELETE_WORKOUT = "DELETE FROM workouts WHERE id = ?;"
+
+_SQL_INSERT_EXERCISE = """
+    INSERT INTO exercises (workout_id, name, sort_order)
+    VALUES (?, ?, ?);
+"""
+
+# Bulk-load variants: a prefix plus one placeholder group per row (see _bulk_insert).
+_SQL_BULK_INSERT_WORKOUTS = ("INSERT INTO workouts (workout_date, title, created_at, updated_at) VALUES ", "(?, ?, ?, ?)")
+_SQL_BULK_INSERT_EXERCISES = ("INSERT INTO exercises (workout_id, name, sort_order) VALUES ", "(?, ?, ?)")
+_SQL_BULK_INSERT_SETS = ("INSERT INTO sets (exercise_id, set_number, reps, weight) VALUES ", "(?, ?, ?, ?)")
+
+# Conservative bound on bound parameters per statement (SQLite's historical default).
+_SQLITE_MAX_PARAMS = 999
+
+_SQL_LAST_INSERT_ROWID = "SELECT last_insert_rowid();"
+
+_SQL_UPDATE_EXERCISE = "UPDATE exercises SET name = ?, sort_order = ? WHERE id = ?;"
+
+_SQL_DELETE_EXERCISE = "DELETE FROM exercises WHERE id = ?;"
+
+_SQL_GET_EXERCISES_FOR_WORKOUT = """
+    SELECT id, name, sort_order
+    FROM exercises
+    WHERE workout_id = ?
+    ORDER BY sort_order ASC, id ASC;
+"""
+
+_SQL_GET_SETS_FOR_WORKOUT = """
+    SELECT s.id, s.exercise_id, s.set_number, s.reps, s.weight
+    FROM sets s
+    JOIN exercises e ON e.id = s.exercise_id
+    WHERE e.workout_id = ?
+    ORDER BY s.set_number ASC, s.id ASC;
+"""
+
+_SQL_UPDATE_SET = "UPDATE sets SET set_number = ?, reps = ?, weight = ? WHERE id = ?;"
+
+_SQL_DELETE_SET = "DELETE FROM sets WHERE id = ?;"
+
+_SQL_INSERT_SET = """
+    INSERT INTO sets (exercise_id, set_number, reps, weight)
+    VALUES (?, ?, ?, ?);
+"""
+
+
+def data_version(conn: sqlite3.Connection) -> str:
+    """Token that changes whenever any workout data is written (or the DB is recreated)."""
+    db_id, version = conn.execute(_SQL_DATA_VERSION).fetchone()
+    return f"{db_id}-{version}"
+
+
+_WORKOUT_LIST_COLUMNS = ("id", "workout_date", "title", "created_at", "updated_at", "exercise_count", "set_count")
+
+
+def list_workouts(conn: sqlite3.Connection) -> Iterator[Dict[str, Any]]:
+    """Yield workouts newest first, reading rows from the cursor as they're consumed."""
+    columns = _WORKOUT_LIST_COLUMNS
+    for r in conn.execute(_SQL_LIST_WORKOUTS):
+        yield dict(zip(columns, r))
+
+
+def get_workout(conn: sqlite3.Connection, workout_id: int) -> Optional[Dict[str, Any]]:
+    w = conn.execute(_SQL_GET_WORKOUT, (workout_id,)).fetchone()
+    if w is None:
+        return None
+
+    rows = conn.execute(_SQL_GET_WORKOUT_EXERCISES, (workout_id,)).fetchall()
+
+    # One row per set (or one NULL-set row for an exercise with no sets), as
+    # plain tuples: (ex_id, name, sort_order, s_id, set_number, reps, weight).
+    # Rows are ordered by exercise, so group them back into the nested shape.
+    exercises: List[Dict[str, Any]] = []
+    for _, ex_rows in groupby(rows, key=itemgetter(0)):
+        ex_rows = list(ex_rows)
+        ex_id, name, sort_order = ex_rows[0][:3]
+        exercises.append(
+            {
+                "id": ex_id,
+                "name": name,
+                "sort_order": sort_order,
+                "sets": [
+                    {"id": s_id, "set_number": set_number, "reps": reps, "weight": weight}
+                    for _, _, _, s_id, set_number, reps, weight in ex_rows
+                    if s_id is not None
+                ],
+            }
+        )
+
+    workout_id, workout_date, title, created_at, updated_at = w
+    return {
+        "id": workout_id,
+        "workout_date": workout_date,
+        "title": title,
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "exercises": exercises,
+    }
+
+
+def _inserted_ids(conn: sqlite3.Connection, count: int) -> range:
+    """
+    Ids of the rows added by the executemany() that just ran.
+
+    Writers hold the write lock (BEGIN IMMEDIATE) and every table uses
+    AUTOINCREMENT, so one batch gets a contiguous run of ids ending at
+    last_insert_rowid().
+    """
+    last_id = conn.execute(_SQL_LAST_INSERT_ROWID).fetchone()[0]
+    return range(last_id - count + 1, last_id + 1)
+
+
+def _insert_exercises(
+    conn: sqlite3.Connection, workout_id: int, exercises: List[Dict[str, Any]], first_sort_order: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Insert a workout's exercises and their sets in two batched statements.
+    Returns them in the same shape get_workout() produces.
+    """
+    exercise_rows = [
+        (workout_id, str(ex["name"]).strip(), sort_order)
+        for sort_order, ex in enumerate(exercises, start=first_sort_order)
+    ]
+    conn.executemany(_SQL_INSERT_EXERCISE, exercise_rows)
+    exercise_ids = _inserted_ids(conn, len(exercise_rows))
+
+    set_rows = [
+        (exercise_id, set_number, _to_int(s.get("reps")), _to_float(s.get("weight")))
+        for exercise_id, ex in zip(exercise_ids, exercises)
+        for set_number, s in enumerate(ex["sets"], start=1)
+    ]
+    conn.executemany(_SQL_INSERT_SET, set_rows)
+    set_ids = _inserted_ids(conn, len(set_rows))
+
+    saved = {
+        exercise_id: {"id": exercise_id, "name": name, "sort_order": sort_order, "sets": []}
+        for exercise_id, (_, name, sort_order) in zip(exercise_ids, exercise_rows)
+    }
+    for set_id, (exercise_id, set_number, reps, weight) in zip(set_ids, set_rows):
+        saved[exercise_id]["sets"].append({"id": set_id, "set_number": set_number, "reps": reps, "weight": weight})
+    return list(saved.values())
+
+
+def create_workout(conn: sqlite3.Connection, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Insert a workout and return it as get_workout() would, without re-reading it."""
     now = datetime.utcnow().isoformat(timespec="seconds") + "Z"
-    try:
-        with conn:
-            cur = conn.execute(
-                """
-                INSERT INTO workouts (workout_date, title, created_at, updated_at)
-                VALUES (?, ?, ?, ?);
-                """,
-                (_parse_iso_date(payload["workout_date"]), (payload.get("title") or "").strip() or None, now, now),
-            )
-            workout_id = int(cur.lastrowid)
-
-            exercises = payload["exercises"]
-            for sort_order, ex in enumerate(exercises, start=1):
-                ex_cur = conn.execute(
-                    """
-                    INSERT INTO exercises (workout_id, name, sort_order)
-                    VALUES (?, ?, ?);
-                    """,
-                    (workout_id, str(ex["name"]).strip(), sort_order),
-                )
-                exercise_id = int(ex_cur.lastrowid)
-                for set_number, s in enumerate(ex["sets"], start=1):
-                    conn.execute(
-                        """
-                        INSERT INTO sets (exercise_id, set_number, reps, weight)
-                        VALUES (?, ?, ?, ?);
-                        """,
-                        (exercise_id, set_number, int(s["reps"]), float(s["weight"])),
-                    )
-        return workout_id
-    finally:
-        conn.close()
+    workout_date = _parse_iso_date(payload["workout_date"])
+    title = (payload.get("title") or "").strip()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE;")
+        cur = conn.execute(_SQL_INSERT_WORKOUT, (workout_date, title, now, now))
+        workout_id = int(cur.lastrowid)
+        conn.execute(_SQL_BUMP_DATA_VERSION)
+
+        exercises = _insert_exercises(conn, workout_id, payload["exercises"])
+    return {
+        "id": workout_id,
+        "workout_date": workout_date,
+        "title": title,
+        "created_at": now,
+        "updated_at": now,
+        "exercises": exercises,
+    }
 
 
-def update_workout(db_path: str, workout_id: int, payload: Dict[str, Any]) -> bool:
+def update_workout(conn: sqlite3.Connection, workout_id: int, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
-    Update by rewriting the workout's exercises+sets inside a transaction.
-    This is simple, reliable, and avoids partial update states.
+    Update inside a transaction by diffing the payload against the stored
+    exercises+sets, matched by position: changed rows are UPDATEd, extra
+    ones INSERTed, missing ones DELETEd. Unchanged rows (and their ids) are
+    left alone, so a small edit only writes what it touched.
+
+    Returns the updated workout (as get_workout() would), or None if it doesn't exist.
     """
-    conn = get_db_connection(db_path)
     now = datetime.utcnow().isoformat(timespec="seconds") + "Z"
-    try:
-        with conn:
-            exists = conn.execute("SELECT 1 FROM workouts WHERE id = ?;", (workout_id,)).fetchone()
-            if exists is None:
-                return False
+    workout_date = _parse_iso_date(payload["workout_date"])
+    title = (payload.get("title") or "").strip()
+    new_exercises = payload["exercises"]
+    with conn:
+        conn.execute("BEGIN IMMEDIATE;")
+        existing = conn.execute(_SQL_WORKOUT_CREATED_AT, (workout_id,)).fetchone()
+        if existing is None:
+            return None
 
-            conn.execute(
-                """
-                UPDATE workouts
-                SET workout_date = ?, title = ?, updated_at = ?
-                WHERE id = ?;
-                """,
-                (_parse_iso_date(payload["workout_date"]), (payload.get("title") or "").strip() or None, now, workout_id),
-            )
+        conn.execute(_SQL_UPDATE_WORKOUT, (workout_date, title, now, workout_id))
+        conn.execute(_SQL_BUMP_DATA_VERSION)
+
+        old_exercises = conn.execute(_SQL_GET_EXERCISES_FOR_WORKOUT, (workout_id,)).fetchall()
+        # exercise id -> [(set id, set_number, reps, weight), ...]
+        old_sets: Dict[int, List[Tuple[int, int, int, float]]] = {ex_id: [] for ex_id, _, _ in old_exercises}
+        for set_id, exercise_id, set_number, reps, weight in conn.execute(_SQL_GET_SETS_FOR_WORKOUT, (workout_id,)):
+            old_sets[exercise_id].append((set_id, set_number, reps, weight))
 
-            # Delete existing children (CASCADE handles sets)
-            conn.execute("DELETE FROM exercises WHERE workout_id = ?;", (workout_id,))
-
-            exercises = payload["exercises"]
-            for sort_order, ex in enumerate(exercises, start=1):
-                ex_cur = conn.execute(
-                    """
-                    INSERT INTO exercises (workout_id, name, sort_order)
-                    VALUES (?, ?, ?);
-                    """,
-                    (workout_id, str(ex["name"]).strip(), sort_order),
+        exercise_updates: List[Tuple[str, int, int]] = []
+        set_updates: List[Tuple[int, Optional[int], Optional[float], int]] = []
+        set_inserts: List[Tuple[int, int, Optional[int], Optional[float]]] = []
+        set_deletes: List[Tuple[int]] = []
+        exercises: List[Dict[str, Any]] = []
+
+        for sort_order, ((old_id, old_name, old_sort_order), ex) in enumerate(
+            zip(old_exercises, new_exercises), start=1
+        ):
+            name = str(ex["name"]).strip()
+            if (old_name, old_sort_order) != (name, sort_order):
+                exercise_updates.append((name, sort_order, old_id))
+
+            sets: List[Dict[str, Any]] = []
+            olds = old_sets[old_id]
+            for set_number, s in enumerate(ex["sets"], start=1):
+                reps, weight = _to_int(s.get("reps")), _to_float(s.get("weight"))
+                if set_number <= len(olds):
+                    old_s = olds[set_number - 1]
+                    if old_s[1:] != (set_number, reps, weight):
+                        set_updates.append((set_number, reps, weight, old_s[0]))
+                    set_id: Optional[int] = old_s[0]
+                else:
+                    set_inserts.append((old_id, set_number, reps, weight))
+                    set_id = None  # assigned below, once the batch is inserted
+                sets.append({"id": set_id, "set_number": set_number, "reps": reps, "weight": weight})
+            set_deletes.extend((old_s[0],) for old_s in olds[len(ex["sets"]):])
+
+            exercises.append({"id": old_id, "name": name, "sort_order": sort_order, "sets": sets})
+
+        # Sets that belonged to a removed exercise go with it (ON DELETE CASCADE).
+        conn.executemany(_SQL_DELETE_EXERCISE, [(old_ex[0],) for old_ex in old_exercises[len(new_exercises):]])
+        conn.executemany(_SQL_DELETE_SET, set_deletes)
+        conn.executemany(_SQL_UPDATE_EXERCISE, exercise_updates)
+        conn.executemany(_SQL_UPDATE_SET, set_updates)
+        if set_inserts:
+            conn.executemany(_SQL_INSERT_SET, set_inserts)
+            new_set_ids = iter(_inserted_ids(conn, len(set_inserts)))
+            for ex in exercises:
+                for s in ex["sets"]:
+                    if s["id"] is None:
+                        s["id"] = next(new_set_ids)
+
+        if len(new_exercises) > len(old_exercises):
+            exercises.extend(
+                _insert_exercises(
+                    conn, workout_id, new_exercises[len(old_exercises):], first_sort_order=len(old_exercises) + 1
                 )
-                exercise_id = int(ex_cur.lastrowid)
-                for set_number, s in enumerate(ex["sets"], start=1):
-                    conn.execute(
-                        """
-                        INSERT INTO sets (exercise_id, set_number, reps, weight)
-                        VALUES (?, ?, ?, ?);
-                        """,
-                        (exercise_id, set_number, int(s["reps"]), float(s["weight"])),
-                    )
-        return True
-    finally:
-        conn.close()
+            )
+    return {
+        "id": workout_id,
+        "workout_date": workout_date,
+        "title": title,
+        "created_at": existing[0],
+        "updated_at": now,
+        "exercises": exercises,
+    }
 
 
-def delete_workout(db_path: str, workout_id: int) -> bool:
-    conn = get_db_connection(db_path)
-    try:
-        with conn:
-            cur = conn.execute("DELETE FROM workouts WHERE id = ?;", (workout_id,))
-            return cur.rowcount > 0
-    finally:
-        conn.close()
+def delete_workout(conn: sqlite3.Connection, workout_id: int) -> bool:
+    with conn:
+        conn.execute("BEGIN IMMEDIATE;")
+        cur = conn.execute(_SQL_DELETE_WORKOUT, (workout_id,))
+        if cur.rowcount == 0:
+            return False
+        conn.execute(_SQL_BUMP_DATA_VERSION)
+        return True
 
 
 # ----------------------------
 # Demo data (for responsiveness demo)
 # ----------------------------
 
-def seed_sample_data(db_path: str, count: int = 200) -> int:
+def seed_sample_data(conn: sqlite3.Connection, count: int = 200) -> int:
     """
     Inserts 'count' fake workouts quickly for demonstrating responsiveness.
     """
-    import random
+    import numpy as np
 
     exercises_pool = [
         "Bench Press", "Squat", "Deadlift", "Overhead Press",
@@ -452,50 +803,75 @@ def seed_sample_data(db_path: str, count: int = 200) -> int:
         "Tricep Pushdown", "Leg Press", "Calf Raise",
     ]
 
-    def random_workout_payload(d: date) -> Dict[str, Any]:
-        ex_count = random.randint(1, 4)
-        picked = random.sample(exercises_pool, ex_count)
-        exercises: List[Dict[str, Any]] = []
-        for ex_name in picked:
-            set_count = random.randint(1, 5)
-            sets = []
-            for _ in range(set_count):
-                reps = random.randint(3, 12)
-                weight = round(random.uniform(0, 315), 1)
-                sets.append({"reps": reps, "weight": weight})
-            exercises.append({"name": ex_name, "sets": sets})
-        return {"workout_date": d.isoformat(), "title": None, "exercises": exercises}
-
-    created = 0
-    start_day = date.today()
-    conn = get_db_connection(db_path)
+    # Draw every random value up front in a few vectorized calls, then just
+    # walk the arrays to build rows. .tolist() gives plain Python numbers,
+    # which is what sqlite3 can bind.
+    rng = np.random.default_rng()
+    ex_counts = rng.integers(1, 5, size=count)  # 1-4 exercises per workout
+    # Each row is a random ordering of the pool, so a workout's first
+    # ex_count picks are distinct exercises.
+    picks = rng.random((count, len(exercises_pool))).argsort(axis=1).tolist()
+    set_counts = rng.integers(1, 6, size=int(ex_counts.sum()))  # 1-5 sets per exercise
+    total_sets = int(set_counts.sum())
+    reps = rng.integers(3, 13, size=total_sets).tolist()
+    weights = np.round(rng.uniform(0, 315, size=total_sets), 1).tolist()
+    ex_counts, set_counts = ex_counts.tolist(), set_counts.tolist()
+
+    today = date.today().toordinal()
+    now = datetime.utcnow().isoformat(timespec="seconds") + "Z"  # one timestamp for the whole batch
+    workout_rows = [(date.fromordinal(today - i).isoformat(), "", now, now) for i in range(count)]
+
+    # Throwaway demo rows: skip the WAL fsync for the bulk load, then put the
+    # pooled connection back to the normal setting.
+    conn.execute("PRAGMA synchronous = OFF;")
     try:
         with conn:
-            for i in range(count):
-                d = start_day.fromordinal(start_day.toordinal() - i)
-                payload = random_workout_payload(d)
-                # reuse create_workout logic but inline for speed
-                now = datetime.utcnow().isoformat(timespec="seconds") + "Z"
-                cur = conn.execute(
-                    "INSERT INTO workouts (workout_date, title, created_at, updated_at) VALUES (?, ?, ?, ?);",
-                    (payload["workout_date"], None, now, now),
-                )
-                workout_id = int(cur.lastrowid)
-                for sort_order, ex in enumerate(payload["exercises"], start=1):
-                    ex_cur = conn.execute(
-                        "INSERT INTO exercises (workout_id, name, sort_order) VALUES (?, ?, ?);",
-                        (workout_id, ex["name"], sort_order),
-                    )
-                    ex_id = int(ex_cur.lastrowid)
-                    for set_number, s in enumerate(ex["sets"], start=1):
-                        conn.execute(
-                            "INSERT INTO sets (exercise_id, set_number, reps, weight) VALUES (?, ?, ?, ?);",
-                            (ex_id, set_number, int(s["reps"]), float(s["weight"])),
-                        )
-                created += 1
-        return created
+            conn.execute("BEGIN IMMEDIATE;")
+            workout_ids = _bulk_insert(conn, _SQL_BULK_INSERT_WORKOUTS, workout_rows)
+            conn.execute(_SQL_BUMP_DATA_VERSION)
+
+            # Child rows are generated lazily as _bulk_insert consumes them,
+            # rather than building every tuple in memory first.
+            exercise_rows = (
+                (workout_id, exercises_pool[picked[k]], k + 1)
+                for workout_id, n, picked in zip(workout_ids, ex_counts, picks)
+                for k in range(n)
+            )
+            exercise_ids = _bulk_insert(conn, _SQL_BULK_INSERT_EXERCISES, exercise_rows)
+
+            def set_rows() -> Iterator[Tuple[int, int, int, float]]:
+                values = zip(reps, weights)
+                for ex_id, n in zip(exercise_ids, set_counts):
+                    for set_number in range(1, n + 1):
+                        r, w = next(values)
+                        yield (ex_id, set_number, r, w)
+
+            _bulk_insert(conn, _SQL_BULK_INSERT_SETS, set_rows())
     finally:
-        conn.close()
+        conn.execute("PRAGMA synchronous = NORMAL;")
+    return count
+
+
+def _bulk_insert(conn: sqlite3.Connection, sql: Tuple[str, str], rows: Iterable[Tuple[Any, ...]]) -> range:
+    """
+    Insert rows with multi-row VALUES statements, as many rows per statement
+    as fit under _SQLITE_MAX_PARAMS. rows can be a generator; it's consumed
+    one statement's worth at a time. Must run inside the caller's write
+    transaction; returns the new ids (see _inserted_ids).
+    """
+    prefix, placeholders = sql
+    per_statement = max(1, _SQLITE_MAX_PARAMS // placeholders.count("?"))
+    full_statement = prefix + ", ".join([placeholders] * per_statement)
+    rows = iter(rows)
+    total = 0
+    while True:
+        chunk = list(islice(rows, per_statement))
+        if not chunk:
+            break
+        statement = full_statement if len(chunk) == per_statement else prefix + ", ".join([placeholders] * len(chunk))
+        conn.execute(statement, [v for row in chunk for v in row])
+        total += len(chunk)
+    return _inserted_ids(conn, total)
 
 
 # ----------------------------
@@ -505,5 +881,11 @@ def seed_sample_data(db_path: str, count: int = 200) -> int:
 app = create_app()
 
 if __name__ == "__main__":
-    # Debug=True for local use. Do not enable in production.
-    app.run(host="127.0.0.1", port=5000, debug=True)
+    # Multi-threaded WSGI server instead of Flask's dev server, so history
+    # reads aren't queued behind a save or a seed (WAL lets them run side by
+    # side). On Linux/macOS gunicorn works too:
+    #   gunicorn -w 1 -k gthread --threads 8 -b 127.0.0.1:5000 app:app
+    # Keep it to one worker process; the write lock is per-process.
+    from waitress import serve
+
+    serve(app, host="127.0.0.1", port=5000, threads=SERVER_THREADS)
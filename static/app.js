@@ -36,6 +36,41 @@ async function fetchJson(url, options = {}) {
   return data;
 }
 
+async function fetchNdjson(url, onRows, options = {}) {
+  // Newline-delimited JSON: one object per line (used for streamed lists).
+  // Lines are parsed as each chunk arrives and handed to onRows(batch), so
+  // the page can render the first rows before the whole body is in.
+  const res = await fetch(url, options);
+  if (!res.ok) {
+    let data = null;
+    try { data = await res.json(); } catch (_) {}
+    const err = new Error((data && data.error) || `Request failed (${res.status})`);
+    err.status = res.status;
+    err.data = data;
+    throw err;
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+  let count = 0;
+  const flush = (lines) => {
+    const rows = lines.filter(line => line.trim()).map(line => JSON.parse(line));
+    if (rows.length) onRows(rows);
+    count += rows.length;
+  };
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffered += decoder.decode(value, { stream: true });
+    const lines = buffered.split("\n");
+    buffered = lines.pop();  // partial last line, completed by the next chunk
+    flush(lines);
+  }
+  flush([buffered + decoder.decode()]);
+  return count;
+}
+
 function setToggleHandlers() {
   // Generic show/hide for any [data-toggle="id"] button controlling #id
   $all("[data-toggle]").forEach(btn => {
@@ -87,39 +122,50 @@ async function loadHistory() {
 
   listEl.innerHTML = `<div class="muted">Loading…</div>`;
   try {
-    const data = await fetchJson("/api/workouts");
-    const workouts = data.workouts || [];
-    if (timingEl) timingEl.textContent = `Loaded in ${data.timing_ms} ms`;
+    const t0 = performance.now();
+    let firstMs = null;
+    const count = await fetchNdjson("/api/workouts", workouts => {
+      if (firstMs === null) {
+        firstMs = performance.now() - t0;
+        listEl.innerHTML = "";
+        emptyEl.hidden = true;
+      }
+      listEl.insertAdjacentHTML("beforeend", workouts.map(renderWorkoutCard).join(""));
+    });
+    const totalMs = performance.now() - t0;
+    if (timingEl) {
+      timingEl.textContent = firstMs === null
+        ? `Loaded in ${totalMs.toFixed(2)} ms`
+        : `First rows in ${firstMs.toFixed(2)} ms, loaded in ${totalMs.toFixed(2)} ms`;
+    }
 
-    if (workouts.length === 0) {
+    if (count === 0) {
       listEl.innerHTML = "";
       emptyEl.hidden = false;
-      return;
     }
-
-    emptyEl.hidden = true;
-    listEl.innerHTML = workouts.map(w => {
-      const title = (w.title || "").trim();
-      const displayTitle = title ? title : "Workout";
-      return `
-        <div class="card" role="article">
-          <h3>
-            <a href="/workout/${w.id}" aria-label="Open workout details">
-              ${escapeHtml(displayTitle)} — ${escapeHtml(w.workout_date)}
-            </a>
-          </h3>
-          <div class="meta">
-            <span>${w.exercise_count} exercise(s)</span>
-            <span>${w.set_count} set(s)</span>
-          </div>
-        </div>
-      `;
-    }).join("");
   } catch (e) {
     listEl.innerHTML = `<div class="errors"><strong>Error:</strong> ${escapeHtml(e.message)}</div>`;
   }
 }
 
+function renderWorkoutCard(w) {
+  const title = (w.title || "").trim();
+  const displayTitle = title ? title : "Workout";
+  return `
+    <div class="card" role="article">
+      <h3>
+        <a href="/workout/${w.id}" aria-label="Open workout details">
+          ${escapeHtml(displayTitle)} — ${escapeHtml(w.workout_date)}
+        </a>
+      </h3>
+      <div class="meta">
+        <span>${w.exercise_count} exercise(s)</span>
+        <span>${w.set_count} set(s)</span>
+      </div>
+    </div>
+  `;
+}
+
 async function seedData() {
   try {
     await fetchJson("/api/debug/seed", { method: "POST", body: JSON.stringify({ count: 200 }) });